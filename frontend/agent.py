@@ -1,16 +1,19 @@
 import asyncio
-from typing import Optional
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
 from uagents import Agent, Context, Bureau
 from models import (
     ChatMessage,
     StructuredOutputRequest,
     StructuredOutputResponse,
     RSVPResponse,
-    EventInput,
-    RSVPInput,
-    ActionType
+    ActionType,
+    parse_event_input,
+    parse_rsvp_input
 )
 from rsvp_service import RSVPService
+from worker_pool import WorkerPool, DEFAULT_MIN_OFFLOAD_BYTES
 import logging
 
 # Configure logging
@@ -27,10 +30,53 @@ agent = Agent(
 # Mini LLM Agent address
 MINI_LLM_ADDRESS = "agent1qtjgj0cex59qhfjg7zulxtd9t89j5dzjjgluqacvhv3eydq2fyn37scacsc"
 
+# Worker mode: jumlah proses untuk decode/formatting reply besar (0 = semua di event loop)
+RSVP_WORKERS = int(os.getenv("RSVP_WORKERS", "0"))
+# Ukuran reply minimum (bytes) yang di-offload ke worker
+RSVP_OFFLOAD_MIN_BYTES = int(os.getenv("RSVP_OFFLOAD_MIN_BYTES", str(DEFAULT_MIN_OFFLOAD_BYTES)))
+pool = WorkerPool(RSVP_WORKERS, min_offload_bytes=RSVP_OFFLOAD_MIN_BYTES)
+
+# Lock per nama event: [lock, jumlah request yang memakai/menunggu]
+_event_locks: Dict[str, List] = {}
+
+
+def event_key(msg: StructuredOutputResponse) -> Optional[str]:
+    """Nama event yang disentuh request, atau None untuk request global (list, health)"""
+    if msg.event_input and msg.event_input.get('name'):
+        return msg.event_input['name']
+    if msg.rsvp_input and msg.rsvp_input.get('event_name'):
+        return msg.rsvp_input['event_name']
+    return msg.event_name
+
+
+@asynccontextmanager
+async def event_order(name: Optional[str]):
+    """Request untuk event yang sama diproses satu per satu sampai balasannya terkirim"""
+    if not name:
+        yield
+        return
+    entry = _event_locks.setdefault(name, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _event_locks[name]
+
+
+@agent.on_event("startup")
+async def start_workers(ctx: Context):
+    """Start worker pool jika worker mode aktif"""
+    if RSVP_WORKERS > 0:
+        await asyncio.get_running_loop().run_in_executor(None, pool.start)
+        ctx.logger.info(f"⚙️ Worker mode aktif dengan {RSVP_WORKERS} proses")
 
 @agent.on_event("shutdown")
 async def cleanup(ctx: Context):
     """Cleanup saat agent shutdown"""
+    await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
     ctx.logger.info("👋 RSVP Manager Agent shutdown complete!")
 
 @agent.on_message(ChatMessage)
@@ -46,23 +92,22 @@ async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
 
 @agent.on_message(StructuredOutputResponse)
 async def handle_structured_output(ctx: Context, sender: str, msg: StructuredOutputResponse):
+    async with event_order(event_key(msg)):
+        await process_structured_output(ctx, sender, msg)
+
+async def process_structured_output(ctx: Context, sender: str, msg: StructuredOutputResponse):
     ctx.logger.info(f"🧠 Received structured output from LLM: {msg.action}")
     
     try:
         # Ensure we have an active session for RSVP service
-        async with RSVPService() as service:
+        async with RSVPService(pool=pool) as service:
             result = None
             
             if msg.action == "create_event" and msg.event_input:
                 ctx.logger.info(f"🎪 Creating event: {msg.event_input.get('name', 'Unknown')}")
                 
                 # Convert dict to EventInput
-                event_input = EventInput(
-                    name=msg.event_input.get('name', ''),
-                    description=msg.event_input.get('description', ''),
-                    date=msg.event_input.get('date', ''),
-                    max_participants=msg.event_input.get('max_participants', 50)
-                )
+                event_input = parse_event_input(msg.event_input)
                 
                 result = await service.create_event(event_input)
                 formatted_message = service.format_response_message(result, "create_event")
@@ -70,18 +115,14 @@ async def handle_structured_output(ctx: Context, sender: str, msg: StructuredOut
                 response = RSVPResponse(
                     success=result.success,
                     message=formatted_message,
-                    data=result.data
+                    data=result.data if isinstance(result.data, dict) else None
                 )
                 
             elif msg.action == "add_rsvp" and msg.rsvp_input:
                 ctx.logger.info(f"📝 Adding RSVP for event: {msg.rsvp_input.get('event_name', 'Unknown')}")
                 
                 # Convert dict to RSVPInput
-                rsvp_input = RSVPInput(
-                    event_name=msg.rsvp_input.get('event_name', ''),
-                    participant_name=msg.rsvp_input.get('participant_name', ''),
-                    participant_email=msg.rsvp_input.get('participant_email', '')
-                )
+                rsvp_input = parse_rsvp_input(msg.rsvp_input)
                 
                 result = await service.add_rsvp(rsvp_input)
                 formatted_message = service.format_response_message(result, "add_rsvp")
@@ -89,7 +130,7 @@ async def handle_structured_output(ctx: Context, sender: str, msg: StructuredOut
                 response = RSVPResponse(
                     success=result.success,
                     message=formatted_message,
-                    data=result.data
+                    data=result.data if isinstance(result.data, dict) else None
                 )
                 
             elif msg.action == "list_events":
@@ -100,7 +141,7 @@ async def handle_structured_output(ctx: Context, sender: str, msg: StructuredOut
                 response = RSVPResponse(
                     success=result.success,
                     message=formatted_message,
-                    data=result.data
+                    data=result.data if isinstance(result.data, dict) else None
                 )
                 
             elif msg.action == "list_rsvps":
@@ -111,7 +152,7 @@ async def handle_structured_output(ctx: Context, sender: str, msg: StructuredOut
                 response = RSVPResponse(
                     success=result.success,
                     message=formatted_message,
-                    data=result.data
+                    data=result.data if isinstance(result.data, dict) else None
                 )
                 
             elif msg.action == "health_check":
@@ -122,7 +163,7 @@ async def handle_structured_output(ctx: Context, sender: str, msg: StructuredOut
                 response = RSVPResponse(
                     success=result.success,
                     message=formatted_message,
-                    data=result.data
+                    data=result.data if isinstance(result.data, dict) else None
                 )
                 
             else:
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import os
+import time
+import cbor2
+from rsvp_service import RSVPService, decode_query_reply
+from worker_pool import WorkerPool
+
+
+def make_list_events_reply(num_events: int) -> bytes:
+    """Membuat balasan query list_events sintetis dalam format CBOR"""
+    events = [
+        {
+            "name": f"Event {i}",
+            "description": f"Deskripsi untuk event nomor {i}",
+            "date": "2025-08-24",
+            "max_participants": 100,
+            "current_participants": i % 100,
+            "created_at": 1_700_000_000_000_000_000 + i
+        }
+        for i in range(num_events)
+    ]
+    return cbor2.dumps({"status": "replied", "reply": {"arg": cbor2.dumps(events)}})
+
+
+async def handle_one(service: RSVPService, response_bytes: bytes) -> str:
+    """Satu request list_events lewat jalur yang sama dengan agent (tanpa HTTP)"""
+    result = await service._decode_reply(decode_query_reply, response_bytes, "list_events")
+    return service.format_response_message(result, "list_events")
+
+
+async def run_batch(service: RSVPService, requests: int, response_bytes: bytes):
+    await asyncio.gather(*(handle_one(service, response_bytes) for _ in range(requests)))
+
+
+def bench(workers: int, requests: int, response_bytes: bytes):
+    """Throughput (request/detik) dan CPU event loop per request (ms) untuk jumlah worker tertentu.
+
+    CPU diukur dengan process_time() di proses utama saja, jadi pekerjaan di worker tidak ikut
+    terhitung; angka ini yang menentukan batas throughput agent di mesin multi-core.
+    """
+    with WorkerPool(workers, min_offload_bytes=0) as pool:
+        service = RSVPService(pool=pool)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        asyncio.run(run_batch(service, requests, response_bytes))
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    return requests / elapsed, cpu / requests * 1000
+
+
+def scaling(args):
+    response_bytes = make_list_events_reply(args.events)
+    print(f"📦 Reply size: {len(response_bytes)} bytes, {args.events} events, {os.cpu_count()} CPU(s)")
+
+    inline, inline_cpu = bench(0, args.requests, response_bytes)
+    print(f"inline     : {inline:8.1f} req/s  (1.00x)  loop CPU {inline_cpu:6.2f} ms/req")
+    for workers in range(1, args.max_workers + 1):
+        throughput, cpu = bench(workers, args.requests, response_bytes)
+        print(f"{workers:2d} worker(s): {throughput:8.1f} req/s  ({throughput / inline:.2f}x)  loop CPU {cpu:6.2f} ms/req")
+
+
+def sweep(args):
+    """Membandingkan CPU event loop inline vs 1 worker per ukuran reply, untuk memilih min_offload_bytes"""
+    print(f"{'events':>7} {'bytes':>9} {'inline ms':>10} {'offload ms':>11}")
+    for num_events in (10, 50, 100, 250, 500, 1000, 2000, 5000):
+        response_bytes = make_list_events_reply(num_events)
+        _, inline_cpu = bench(0, args.requests, response_bytes)
+        _, offload_cpu = bench(1, args.requests, response_bytes)
+        print(f"{num_events:7d} {len(response_bytes):9d} {inline_cpu:10.3f} {offload_cpu:11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker pool RSVP agent")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--events", type=int, default=2000, help="Jumlah event per reply")
+    parser.add_argument("--sweep", action="store_true", help="Bandingkan inline vs offload per ukuran reply")
+    args = parser.parse_args()
+
+    if args.sweep:
+        sweep(args)
+    else:
+        scaling(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Literal, List
+from typing import Optional, Literal, List, Any
 from uagents import Model, Protocol
 from enum import Enum
 
@@ -23,6 +23,22 @@ class EventInput(BaseModel):
     date: str
     max_participants: int
 
+# Parsing dict dari LLM ke input model (murah, jadi tetap dijalankan inline di agent)
+def parse_event_input(data: dict) -> EventInput:
+    return EventInput(
+        name=data.get('name', ''),
+        description=data.get('description', ''),
+        date=data.get('date', ''),
+        max_participants=data.get('max_participants', 50)
+    )
+
+def parse_rsvp_input(data: dict) -> RSVPInput:
+    return RSVPInput(
+        event_name=data.get('event_name', ''),
+        participant_name=data.get('participant_name', ''),
+        participant_email=data.get('participant_email', '')
+    )
+
 class Event(BaseModel):
     name: str
     description: str
@@ -90,7 +106,8 @@ class AgentRSVPResponse(Model):
 class ServiceResult(BaseModel):
     success: bool
     message: str
-    data: Optional[dict] = None
+    data: Optional[Any] = None  # dict, list, atau text tergantung method canister
+    formatted_message: Optional[str] = None  # diisi jika reply sudah diformat di worker pool
 
 # Protocol definitions
 chat_protocol = Protocol("Chat")
@@ -1,15 +1,44 @@
 import aiohttp
 import cbor2
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from models import RSVP, Event, RSVPInput, EventInput, ServiceResult
+from worker_pool import WorkerPool
 import logging
 import time
 
+
+def decode_call_reply(response_bytes: bytes) -> ServiceResult:
+    """Decode balasan CBOR dari endpoint call"""
+    return ServiceResult(success=True, message="Success", data=cbor2.loads(response_bytes))
+
+
+def decode_query_reply(response_bytes: bytes) -> ServiceResult:
+    """Decode balasan CBOR dari endpoint query, termasuk arg di dalam reply"""
+    response_data = cbor2.loads(response_bytes)
+    if response_data.get("status") == "replied":
+        decoded_arg = cbor2.loads(response_data['reply']['arg'])
+        return ServiceResult(success=True, message="Success", data=decoded_arg)
+    else:
+        return ServiceResult(success=False, message=f"Query failed: {response_data.get('reject_message')}", data=None)
+
+
+def decode_and_format(decoder: Callable[[bytes], ServiceResult], response_bytes: bytes, action: str) -> Tuple[bool, str, str]:
+    """Decode dan format dalam satu job worker.
+
+    Yang dikirim balik hanya (success, message, teks terformat), bukan data hasil decode,
+    supaya event loop tidak perlu unpickle list besar yang ukurannya sebanding dengan reply.
+    """
+    result = decoder(response_bytes)
+    return result.success, result.message, format_response_message(result, action)
+
+
 class RSVPService:
-    def __init__(self, canister_id: str = None, gateway_url: str = "http://127.0.0.1:4943"):
+    def __init__(self, canister_id: str = None, gateway_url: str = "http://127.0.0.1:4943", pool: Optional[WorkerPool] = None):
         self.gateway_url = gateway_url
         self.canister_id = canister_id or "uxrrr-q7777-77774-qaaaq-cai"  # Pastikan ID ini benar
+        # Pool opsional untuk decode dan format reply besar di proses lain; tanpa pool semuanya inline
+        self.pool = pool or WorkerPool()
         
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
@@ -22,7 +51,17 @@ class RSVPService:
         if self.session:
             await self.session.close()
     
-    async def _call_canister(self, method_name: str, args: Any = None) -> ServiceResult:
+    async def _decode_reply(self, decoder: Callable[[bytes], ServiceResult], response_bytes: bytes, action: str) -> ServiceResult:
+        """Decode reply inline, atau decode + format di worker jika reply cukup besar.
+
+        Hasil dari worker hanya membawa teks terformat; data mentahnya tidak diteruskan.
+        """
+        if not self.pool.enabled or len(response_bytes) < self.pool.min_offload_bytes:
+            return decoder(response_bytes)
+        success, message, formatted_message = await self.pool.run(decode_and_format, decoder, response_bytes, action)
+        return ServiceResult(success=success, message=message, data=None, formatted_message=formatted_message)
+    
+    async def _call_canister(self, method_name: str, args: Any = None, action: Optional[str] = None) -> ServiceResult:
         """Memanggil method di canister dengan format CBOR dan payload yang lengkap"""
         try:
             # BARU: Membuat timestamp kedaluwarsa 5 menit dari sekarang
@@ -55,7 +94,7 @@ class RSVPService:
             async with self.session.post(url, data=cbor_payload, headers=headers) as response:
                 if response.status == 200:
                     response_bytes = await response.read()
-                    return ServiceResult(success=True, message="Success", data=cbor2.loads(response_bytes))
+                    return await self._decode_reply(decode_call_reply, response_bytes, action or method_name)
                 else:
                     error_text = await response.text()
                     return ServiceResult(success=False, message=f"HTTP {response.status}: {error_text}", data=None)
@@ -63,7 +102,7 @@ class RSVPService:
             self.logger.error(f"Error calling canister: {str(e)}")
             return ServiceResult(success=False, message=f"Error calling canister: {str(e)}", data=None)
 
-    async def _query_canister(self, method_name: str, args: Any = None) -> ServiceResult:
+    async def _query_canister(self, method_name: str, args: Any = None, action: Optional[str] = None) -> ServiceResult:
         """Query method di canister dengan format CBOR dan payload yang lengkap"""
         try:
             # BARU: Membuat timestamp kedaluwarsa 5 menit dari sekarang
@@ -91,12 +130,7 @@ class RSVPService:
             async with self.session.post(url, data=cbor_payload, headers=headers) as response:
                 if response.status == 200:
                     response_bytes = await response.read()
-                    response_data = cbor2.loads(response_bytes)
-                    if response_data.get("status") == "replied":
-                        decoded_arg = cbor2.loads(response_data['reply']['arg'])
-                        return ServiceResult(success=True, message="Success", data=decoded_arg)
-                    else:
-                        return ServiceResult(success=False, message=f"Query failed: {response_data.get('reject_message')}", data=None)
+                    return await self._decode_reply(decode_query_reply, response_bytes, action or method_name)
                 else:
                     error_text = await response.text()
                     return ServiceResult(success=False, message=f"HTTP {response.status}: {error_text}", data=None)
@@ -213,64 +247,71 @@ class RSVPService:
     
     async def health_check(self) -> ServiceResult:
         """Health check"""
-        return await self._query_canister("health")
+        return await self._query_canister("health", action="health_check")
     
     def format_response_message(self, result: ServiceResult, action: str) -> str:
-        """Format response message untuk user"""
-        if not result.success:
-            return f"❌ Error: {result.message}"
-        
-        if action == "create_event":
-            return f"✅ {result.data if isinstance(result.data, str) else 'Event berhasil dibuat!'}"
-        
-        elif action == "add_rsvp":
-            return f"✅ {result.data if isinstance(result.data, str) else 'RSVP berhasil ditambahkan!'}"
-        
-        elif action == "list_events":
-            if isinstance(result.data, list) and result.data:
-                events_text = "\n📅 **Daftar Event:**\n"
-                for event in result.data:
-                    events_text += f"• **{event.get('name', 'N/A')}**\n"
-                    events_text += f"  📝 {event.get('description', 'N/A')}\n"
-                    events_text += f"  🗓️ {event.get('date', 'N/A')}\n"
-                    events_text += f"  👥 {event.get('current_participants', 0)}/{event.get('max_participants', 0)} peserta\n\n"
-                return events_text
-            else:
-                return "📅 Tidak ada event yang ditemukan."
-        
-        elif action == "list_rsvps" or action == "list_rsvps_by_event":
-            if isinstance(result.data, list) and result.data:
-                rsvps_text = "\n📋 **Daftar RSVP:**\n"
-                for rsvp in result.data:
-                    status_emoji = "✅" if rsvp.get('status') == "confirmed" else "❌" if rsvp.get('status') == "cancelled" else "⏳"
-                    rsvps_text += f"• **{rsvp.get('participant_name', 'N/A')}** {status_emoji}\n"
-                    rsvps_text += f"  📧 {rsvp.get('participant_email', 'N/A')}\n"
-                    rsvps_text += f"  🎪 Event: {rsvp.get('event_name', 'N/A')}\n"
-                    rsvps_text += f"  📊 Status: {rsvp.get('status', 'N/A')}\n\n"
-                return rsvps_text
-            else:
-                return "📋 Tidak ada RSVP yang ditemukan."
-        
-        elif action == "get_rsvp":
-            if result.data:
-                rsvp = result.data
+        """Format response message untuk user (memakai hasil dari worker jika sudah ada)"""
+        if result.formatted_message is not None:
+            return result.formatted_message
+        return format_response_message(result, action)
+
+
+def format_response_message(result: ServiceResult, action: str) -> str:
+    """Format response message untuk user"""
+    if not result.success:
+        return f"❌ Error: {result.message}"
+    
+    if action == "create_event":
+        return f"✅ {result.data if isinstance(result.data, str) else 'Event berhasil dibuat!'}"
+    
+    elif action == "add_rsvp":
+        return f"✅ {result.data if isinstance(result.data, str) else 'RSVP berhasil ditambahkan!'}"
+    
+    elif action == "list_events":
+        if isinstance(result.data, list) and result.data:
+            events_text = "\n📅 **Daftar Event:**\n"
+            for event in result.data:
+                events_text += f"• **{event.get('name', 'N/A')}**\n"
+                events_text += f"  📝 {event.get('description', 'N/A')}\n"
+                events_text += f"  🗓️ {event.get('date', 'N/A')}\n"
+                events_text += f"  👥 {event.get('current_participants', 0)}/{event.get('max_participants', 0)} peserta\n\n"
+            return events_text
+        else:
+            return "📅 Tidak ada event yang ditemukan."
+    
+    elif action == "list_rsvps" or action == "list_rsvps_by_event":
+        if isinstance(result.data, list) and result.data:
+            rsvps_text = "\n📋 **Daftar RSVP:**\n"
+            for rsvp in result.data:
                 status_emoji = "✅" if rsvp.get('status') == "confirmed" else "❌" if rsvp.get('status') == "cancelled" else "⏳"
-                return f"📋 **RSVP Details:**\n• **{rsvp.get('participant_name', 'N/A')}** {status_emoji}\n📧 {rsvp.get('participant_email', 'N/A')}\n🎪 Event: {rsvp.get('event_name', 'N/A')}\n📊 Status: {rsvp.get('status', 'N/A')}"
-            else:
-                return "❌ RSVP tidak ditemukan."
-        
-        elif action == "cancel_rsvp":
-            return f"✅ {result.data if isinstance(result.data, str) else 'RSVP berhasil dibatalkan!'}"
-        
-        elif action == "get_event_by_name":
-            if result.data:
-                event = result.data
-                return f"📅 **Event Details:**\n• **{event.get('name', 'N/A')}**\n📝 {event.get('description', 'N/A')}\n🗓️ {event.get('date', 'N/A')}\n👥 {event.get('current_participants', 0)}/{event.get('max_participants', 0)} peserta"
-            else:
-                return "❌ Event tidak ditemukan."
-        
-        elif action == "health_check":
-            return f"🟢 {result.data if isinstance(result.data, str) else 'Service is running healthy!'}"
-        
+                rsvps_text += f"• **{rsvp.get('participant_name', 'N/A')}** {status_emoji}\n"
+                rsvps_text += f"  📧 {rsvp.get('participant_email', 'N/A')}\n"
+                rsvps_text += f"  🎪 Event: {rsvp.get('event_name', 'N/A')}\n"
+                rsvps_text += f"  📊 Status: {rsvp.get('status', 'N/A')}\n\n"
+            return rsvps_text
+        else:
+            return "📋 Tidak ada RSVP yang ditemukan."
+    
+    elif action == "get_rsvp":
+        if result.data:
+            rsvp = result.data
+            status_emoji = "✅" if rsvp.get('status') == "confirmed" else "❌" if rsvp.get('status') == "cancelled" else "⏳"
+            return f"📋 **RSVP Details:**\n• **{rsvp.get('participant_name', 'N/A')}** {status_emoji}\n📧 {rsvp.get('participant_email', 'N/A')}\n🎪 Event: {rsvp.get('event_name', 'N/A')}\n📊 Status: {rsvp.get('status', 'N/A')}"
+        else:
+            return "❌ RSVP tidak ditemukan."
+    
+    elif action == "cancel_rsvp":
+        return f"✅ {result.data if isinstance(result.data, str) else 'RSVP berhasil dibatalkan!'}"
+    
+    elif action == "get_event_by_name":
+        if result.data:
+            event = result.data
+            return f"📅 **Event Details:**\n• **{event.get('name', 'N/A')}**\n📝 {event.get('description', 'N/A')}\n🗓️ {event.get('date', 'N/A')}\n👥 {event.get('current_participants', 0)}/{event.get('max_participants', 0)} peserta"
         else:
-            return f"✅ Operasi berhasil: {result.message}"
\ No newline at end of file
+            return "❌ Event tidak ditemukan."
+    
+    elif action == "health_check":
+        return f"🟢 {result.data if isinstance(result.data, str) else 'Service is running healthy!'}"
+    
+    else:
+        return f"✅ Operasi berhasil: {result.message}"
\ No newline at end of file
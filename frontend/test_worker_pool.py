@@ -0,0 +1,85 @@
+import asyncio
+import os
+import pickle
+import cbor2
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from models import parse_event_input, parse_rsvp_input
+from rsvp_service import RSVPService, decode_and_format, decode_query_reply, format_response_message
+from worker_pool import WorkerPool
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _crash():
+    os._exit(1)
+
+
+def _query_reply(num_events: int) -> bytes:
+    events = [{"name": f"Event {i}", "description": "d" * 64} for i in range(num_events)]
+    return cbor2.dumps({"status": "replied", "reply": {"arg": cbor2.dumps(events)}})
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with WorkerPool(2) as pool:
+        yield pool
+
+
+def test_workers_zero_runs_inline():
+    pool = WorkerPool(0)
+    pool.start()
+    assert not pool.enabled
+    assert asyncio.run(pool.run(_pid)) == os.getpid()
+
+
+def test_stage_functions_pickle():
+    for fn in (decode_query_reply, decode_and_format, format_response_message, parse_event_input, parse_rsvp_input):
+        assert pickle.loads(pickle.dumps(fn)) is fn
+
+
+def test_parse_defaults():
+    event = parse_event_input({"name": "Meetup"})
+    assert (event.name, event.description, event.date, event.max_participants) == ("Meetup", "", "", 50)
+    rsvp = parse_rsvp_input({})
+    assert (rsvp.event_name, rsvp.participant_name, rsvp.participant_email) == ("", "", "")
+
+
+def test_jobs_spread_across_workers(pool):
+    async def scenario():
+        return await asyncio.gather(*(pool.run(_pid) for _ in range(8)))
+
+    pids = set(asyncio.run(scenario()))
+    assert len(pids) == 2 and os.getpid() not in pids
+
+
+def test_worker_crash_replaces_shard():
+    async def scenario(pool: WorkerPool):
+        before = await pool.run(_pid)
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(_crash)
+        after = await pool.run(_pid)
+        assert after != before
+
+    with WorkerPool(1) as pool:
+        asyncio.run(scenario(pool))
+
+
+def test_large_reply_returns_formatted_text_only(pool):
+    response_bytes = _query_reply(800)
+    assert len(response_bytes) >= pool.min_offload_bytes
+    service = RSVPService(pool=pool)
+    result = asyncio.run(service._decode_reply(decode_query_reply, response_bytes, "list_events"))
+    assert result.success and result.data is None
+    assert result.formatted_message == format_response_message(decode_query_reply(response_bytes), "list_events")
+    assert service.format_response_message(result, "list_events") == result.formatted_message
+
+
+def test_small_reply_decoded_inline(pool):
+    response_bytes = _query_reply(3)
+    assert len(response_bytes) < pool.min_offload_bytes
+    service = RSVPService(pool=pool)
+    result = asyncio.run(service._decode_reply(decode_query_reply, response_bytes, "list_events"))
+    assert result.formatted_message is None and len(result.data) == 3